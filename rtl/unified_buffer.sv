@@ -226,8 +226,11 @@ module unified_buffer #(
   // Functional model: supports arbitrary bit masks, including INT4 nibble
   // writeback. This is convenient for RTL simulation but is not a direct FPGA
   // BRAM template.
+  // Keep the deep banks out of VCD/FST dumps; tracing them dominates dump cost.
+  /* verilator tracing_off */
   logic [`BUFFER_WIDTH-1:0] memory [`BUFFER_DEPTH-1:0];
   logic [`BUFFER_WIDTH-1:0] weight_bank[`BUFFER_DEPTH-1:0];
+  /* verilator tracing_on */
 
   always_ff @(posedge clk) begin
     if (wr_en) begin
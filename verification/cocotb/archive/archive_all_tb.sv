@@ -0,0 +1,122 @@
+`include "defines.sv"
+
+// ============================================================================
+// Combined Archive Test Wrapper
+// ============================================================================
+// Instantiates every archived component testbench side by side so the whole
+// archive runs from a single elaboration (see test_all.py). Each block's ports
+// are re-exported with a prefix:
+//   sk_*  -> skewer_flat_tb     (test_skewer, test_valid_chain)
+//   num_* -> systolic_flat_tb   (test_numeric)
+//   ub_*  -> ub_skewer_wrapper  (test_ub_skewer)
+// clk and rst_n are shared by all three blocks.
+
+module archive_all_tb (
+    input logic clk,
+    input logic rst_n,
+
+    // ------------------------------------------------------------------------
+    // Skewer
+    // ------------------------------------------------------------------------
+    input  logic                                  sk_en,
+    input  logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]    sk_data_in_flat,
+    output logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]    sk_data_out_flat,
+    input  logic                                  sk_first_in,
+    input  logic                                  sk_last_in,
+    output logic                                  sk_first_out,
+    output logic                                  sk_last_out,
+    output logic [`ARRAY_SIZE-1:0]                sk_valid_out,
+
+    // ------------------------------------------------------------------------
+    // Systolic array (numeric)
+    // ------------------------------------------------------------------------
+    input  logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]    num_input_data_flat,
+    input  logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]    num_weight_data_flat,
+    input  precision_mode_t                       num_precision_mode,
+    input  logic                                  num_compute_enable,
+    input  logic                                  num_drain_enable,
+    input  logic                                  num_acc_clear,
+    output logic [`ARRAY_SIZE*`ARRAY_SIZE*`ACC_WIDTH-1:0] num_results_flat,
+    output logic                                  num_result_valid,
+
+    // ------------------------------------------------------------------------
+    // Unified buffer + skewers
+    // ------------------------------------------------------------------------
+    input  logic                                  ub_en,
+    input  logic                                  ub_wr_en,
+    input  logic [`ADDR_WIDTH-1:0]                ub_wr_addr,
+    input  logic [`BUFFER_WIDTH-1:0]              ub_wr_data,
+    input  logic [`ADDR_WIDTH-1:0]                ub_input_addr,
+    input  logic                                  ub_input_first_in,
+    input  logic                                  ub_input_last_in,
+    input  logic [`ADDR_WIDTH-1:0]                ub_weight_addr,
+    input  logic                                  ub_weight_first_in,
+    input  logic                                  ub_weight_last_in,
+    output logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]    ub_input_data_flat,
+    output logic                                  ub_dut_input_first_out,
+    output logic                                  ub_dut_input_last_out,
+    output logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]    ub_mem_input_data_flat,
+    output logic                                  ub_mem_input_first,
+    output logic                                  ub_mem_input_last,
+    output logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]    ub_weight_data_flat,
+    output logic                                  ub_dut_weight_first_out,
+    output logic                                  ub_dut_weight_last_out,
+    output logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]    ub_mem_weight_data_flat,
+    output logic                                  ub_mem_weight_first,
+    output logic                                  ub_mem_weight_last
+);
+
+    skewer_flat_tb sk (
+        .clk          (clk),
+        .rst_n        (rst_n),
+        .en           (sk_en),
+        .data_in_flat (sk_data_in_flat),
+        .data_out_flat(sk_data_out_flat),
+        .first_in     (sk_first_in),
+        .last_in      (sk_last_in),
+        .first_out    (sk_first_out),
+        .last_out     (sk_last_out),
+        .valid_out    (sk_valid_out)
+    );
+
+    systolic_flat_tb num (
+        .clk             (clk),
+        .rst_n           (rst_n),
+        .input_data_flat (num_input_data_flat),
+        .weight_data_flat(num_weight_data_flat),
+        .precision_mode  (num_precision_mode),
+        .compute_enable  (num_compute_enable),
+        .drain_enable    (num_drain_enable),
+        .acc_clear       (num_acc_clear),
+        .results_flat    (num_results_flat),
+        .result_valid    (num_result_valid)
+    );
+
+    ub_skewer_wrapper ub (
+        .clk                 (clk),
+        .rst_n               (rst_n),
+        .en                  (ub_en),
+        .wr_en               (ub_wr_en),
+        .wr_addr             (ub_wr_addr),
+        .wr_data             (ub_wr_data),
+        .input_addr          (ub_input_addr),
+        .input_first_in      (ub_input_first_in),
+        .input_last_in       (ub_input_last_in),
+        .weight_addr         (ub_weight_addr),
+        .weight_first_in     (ub_weight_first_in),
+        .weight_last_in      (ub_weight_last_in),
+        .input_data_flat     (ub_input_data_flat),
+        .dut_input_first_out (ub_dut_input_first_out),
+        .dut_input_last_out  (ub_dut_input_last_out),
+        .mem_input_data_flat (ub_mem_input_data_flat),
+        .mem_input_first     (ub_mem_input_first),
+        .mem_input_last      (ub_mem_input_last),
+        .weight_data_flat    (ub_weight_data_flat),
+        .dut_weight_first_out(ub_dut_weight_first_out),
+        .dut_weight_last_out (ub_dut_weight_last_out),
+        .mem_weight_data_flat(ub_mem_weight_data_flat),
+        .mem_weight_first    (ub_mem_weight_first),
+        .mem_weight_last     (ub_mem_weight_last)
+    );
+
+endmodule
@@ -0,0 +1,58 @@
+`include "defines.sv"
+
+// ============================================================================
+// Streaming Skewer Test Wrapper (flattened input)
+// ============================================================================
+// Exposes the skewer's unpacked data_in array as a single packed vector so the
+// cocotb tests can drive all rows with one write per cycle (mirrors the
+// existing data_out_flat output).
+
+module skewer_flat_tb #(
+    parameter N = `ARRAY_SIZE,
+    parameter DATA_WIDTH = `DATA_WIDTH
+) (
+    input  logic clk,
+    input  logic rst_n,
+    input  logic en,
+
+    // Flattened data interface (row 0 in the LSBs)
+    input  logic [N*DATA_WIDTH-1:0] data_in_flat,
+    output logic [N*DATA_WIDTH-1:0] data_out_flat,
+
+    // Marker signals
+    input  logic first_in,
+    input  logic last_in,
+    output logic first_out,
+    output logic last_out,
+
+    output logic [N-1:0] valid_out
+);
+
+    logic [DATA_WIDTH-1:0] data_in  [N-1:0];
+    logic [DATA_WIDTH-1:0] data_out [N-1:0];
+
+    genvar i;
+    generate
+        for (i = 0; i < N; i++) begin : unpack_in
+            assign data_in[i] = data_in_flat[(i+1)*DATA_WIDTH-1 -: DATA_WIDTH];
+        end
+    endgenerate
+
+    streaming_skewer #(
+        .N         (N),
+        .DATA_WIDTH(DATA_WIDTH)
+    ) dut (
+        .clk          (clk),
+        .rst_n        (rst_n),
+        .en           (en),
+        .data_in      (data_in),
+        .data_out     (data_out),
+        .first_in     (first_in),
+        .last_in      (last_in),
+        .first_out    (first_out),
+        .last_out     (last_out),
+        .valid_out    (valid_out),
+        .data_out_flat(data_out_flat)
+    );
+
+endmodule
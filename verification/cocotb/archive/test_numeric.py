@@ -1,13 +1,97 @@
+import math
+
 import cocotb
+import numpy as np
+from cocotb.binary import BinaryValue
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge
+from cocotb.triggers import Combine, RisingEdge
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 MODE_INT16 = 2
+DATA_WIDTH = 16
 ACC_WIDTH = 64
 ARRAY_SIZE = 4
 
-@cocotb.test()
-async def test_numeric_matmul(dut):
+# Precomputed lane mask/shifts shared by every pack call
+DATA_MASK = (1 << DATA_WIDTH) - 1
+LANE_SHIFTS = [i * DATA_WIDTH for i in range(ARRAY_SIZE)]
+
+
+def pack_lanes(values):
+    """Pack per-lane values into one flat bus value (lane 0 in the LSBs)."""
+    packed = 0
+    for v, shift in zip(values, LANE_SHIFTS):
+        packed |= (v & DATA_MASK) << shift
+    return packed
+
+
+async def wait_for_level(sig, edge, level=1, timeout=64):
+    """Advance on edge until sig reads level; raise after timeout cycles."""
+    for _ in range(timeout):
+        if int(sig.value) == level:
+            return
+        await edge
+    raise TimeoutError(f"{sig._name} did not reach {level} within {timeout} cycles")
+
+
+def sign_extend(val, width=ACC_WIDTH):
+    """Branchless two's-complement sign extension of a width-bit unsigned value."""
+    return val - ((val >> (width - 1)) << width)
+
+
+def unpack_results(buff, n=ARRAY_SIZE, width=ACC_WIDTH):
+    """Unpack the raw results_flat bytes into an (n, n) int64 array.
+
+    Layout: Row0_Col0, Row0_Col1, ..., Row1_Col0, ... with Row0_Col0 in the LSBs,
+    at the RTL's ARRAY_SIZE row stride (which may exceed n); the result is the
+    top-left n x n block. BinaryValue.buff is MSB-first, so the big-endian int64
+    lanes are reversed to put Row0_Col0 first; the int64 view carries the sign
+    directly. Other accumulator widths fall back to sign_extend over the packed
+    integer.
+    """
+    side = math.isqrt(len(buff) * 8 // width)
+    if width == 64:
+        lanes = np.frombuffer(buff, dtype=">i8")[::-1]
+        return lanes.reshape(side, side)[:n, :n]
+    packed = int.from_bytes(buff, "big")
+    mask = (1 << width) - 1
+    vals = [
+        sign_extend((packed >> ((r * side + c) * width)) & mask, width)
+        for r in range(n)
+        for c in range(n)
+    ]
+    return np.array(vals, dtype=np.int64).reshape(n, n)
+
+
+def _fill_skew(lanes, sched):
+    """Copy lane i of lanes into column i of sched, delayed by i cycles."""
+    n, k = lanes.shape
+    total_cycles = sched.shape[0]
+    for i in range(n):
+        # Lanes delayed past the end of the schedule contribute nothing
+        sched[i:i + k, i] = lanes[i, :max(total_cycles - i, 0)]
+
+
+_fill_skew_py = _fill_skew
+
+# numba is optional: JIT the stimulus kernel when available. Serial on purpose:
+# with one iteration per lane, a parallel loop would only add thread-pool startup.
+if njit is not None:
+    _fill_skew = njit(cache=True)(_fill_skew)
+
+
+def skew_stimulus(lanes, total_cycles, fill=None):
+    """Build the skewed (total_cycles, N) stimulus: lane i streams lanes[i, :] starting at cycle i."""
+    sched = np.zeros((total_cycles, lanes.shape[0]), dtype=np.int64)
+    (fill or _fill_skew)(np.ascontiguousarray(lanes, dtype=np.int64), sched)
+    return sched
+
+
+async def run_numeric_matmul(dut):
     """Test 4x4 matrix multiplication numerically using flattened output port."""
     
     clock = Clock(dut.clk, 10, units="ns")
@@ -24,11 +108,18 @@ async def test_numeric_matmul(dut):
          [0, 0, 1, 0],
          [0, 0, 0, 1]]
     
-    # Expected result: C = A × I = A (identity matrix multiplication)
-    C_expected = [[1,  2,  3,  4],
-                  [5,  6,  7,  8],
-                  [9,  10, 11, 12],
-                  [13, 14, 15, 16]]
+    A_np = np.array(A, dtype=np.int64)
+    B_np = np.array(B, dtype=np.int64)
+    # Reference result (A × I = A for the identity weights above)
+    C_expected = A_np @ B_np
+    
+    # Bind handles once so the clocked loops avoid hierarchy lookups
+    clk = dut.clk
+    input_data_flat = dut.input_data_flat
+    weight_data_flat = dut.weight_data_flat
+    results_flat = dut.results_flat
+    result_valid = dut.result_valid
+    edge = RisingEdge(clk)
     
     # Reset
     dut.rst_n.value = 0
@@ -37,13 +128,12 @@ async def test_numeric_matmul(dut):
     dut.drain_enable.value = 0
     dut.acc_clear.value = 0
     
-    for i in range(4):
-        dut.input_data[i].value = 0
-        dut.weight_data[i].value = 0
+    input_data_flat.value = 0
+    weight_data_flat.value = 0
     
-    await RisingEdge(dut.clk)
+    await edge
     dut.rst_n.value = 1
-    await RisingEdge(dut.clk)
+    await edge
     
     dut._log.info("Injecting skewed data...")
     
@@ -53,80 +143,78 @@ async def test_numeric_matmul(dut):
     # Total cycles: skew delay (N-1) + K products + pipeline settling
     total_cycles = (N - 1) + K + 5
     
-    for cycle in range(total_cycles):
-        # Inject inputs (A matrix) with row skewing
-        for r in range(N):
-            k = cycle - r  # Row r starts at cycle r
-            if 0 <= k < K:
-                dut.input_data[r].value = A[r][k]
-            else:
-                dut.input_data[r].value = 0
-        
-        # Inject weights (B matrix) with column skewing
-        for c in range(N):
-            k = cycle - c  # Column c starts at cycle c
-            if 0 <= k < K:
-                dut.weight_data[c].value = B[k][c]
-            else:
-                dut.weight_data[c].value = 0
-        
-        await RisingEdge(dut.clk)
-    
-    # Clear inputs and settle
-    for i in range(N):
-        dut.input_data[i].value = 0
-        dut.weight_data[i].value = 0
-    
-    # Wait for computation to finish and result_valid to assert
-    for _ in range(50):
-        await RisingEdge(dut.clk)
-        
+    # Precompute the whole skewed schedule up front:
+    # row r of A starts at cycle r, column c of B starts at cycle c.
+    A_skew = skew_stimulus(A_np, total_cycles)
+    B_skew = skew_stimulus(B_np.T, total_cycles)
+    in_words = [pack_lanes(row) for row in A_skew.tolist()]
+    w_words = [pack_lanes(row) for row in B_skew.tolist()]
+    
+    # One BinaryValue per bus, refilled each cycle instead of rebuilt per write
+    in_bv = BinaryValue(n_bits=len(input_data_flat), bigEndian=False)
+    w_bv = BinaryValue(n_bits=len(weight_data_flat), bigEndian=False)
+
+    async def driver():
+        for cycle in range(total_cycles):
+            # One write per bus instead of one per lane
+            in_bv.integer = in_words[cycle]
+            w_bv.integer = w_words[cycle]
+            input_data_flat.value = in_bv
+            weight_data_flat.value = w_bv
+            await edge
+
+        # Clear inputs and stop injecting
+        input_data_flat.value = 0
+        weight_data_flat.value = 0
+        dut.compute_enable.value = 0
+
+    async def monitor():
+        # result_valid is compute_enable delayed by the array depth, so once it
+        # has risen and dropped again every injected wavefront has drained.
+        await wait_for_level(result_valid, edge, level=1)
+        await wait_for_level(result_valid, edge, level=0)
+
+    driver_task = cocotb.start_soon(driver())
+    monitor_task = cocotb.start_soon(monitor())
+    await Combine(driver_task.join(), monitor_task.join())
+    
     dut._log.info("Checking results from flattened port...")
     
     # Read the flattened result vector
-    # results_flat is a huge integer
     # Width = 4 * 4 * 64 = 1024 bits
-    flat_val = dut.results_flat.value
+    flat_val = results_flat.value
     
-    # Convert to big integer
+    # Grab the raw bytes; skips building a 1024-bit Python int
     try:
-        flat_int = flat_val.integer
+        flat_buff = flat_val.buff
     except ValueError:
         dut._log.error(f"Results Flat is 'X' or 'Z': {flat_val}")
         assert False, "Simulation outputs are undefined!"
 
-    C_actual = []
-    all_correct = True
-    
-    # Unpack manually
-    # Layout: Row0_Col0, Row0_Col1, ..., Row1_Col0, ...
-    # LSB is Row0_Col0
-    mask = (1 << ACC_WIDTH) - 1
-    
+    C_actual = unpack_results(flat_buff, N)
     for r in range(N):
-        row = []
-        for c in range(N):
-            # Calculate bit offset
-            idx = r * N + c
-            offset = idx * ACC_WIDTH
-            
-            # Extract ACC_WIDTH bits
-            val_unsigned = (flat_int >> offset) & mask
-            
-            # Convert to signed 64-bit
-            if val_unsigned & (1 << (ACC_WIDTH - 1)):
-                val_signed = val_unsigned - (1 << ACC_WIDTH)
-            else:
-                val_signed = val_unsigned
-                
-            row.append(val_signed)
-            
-            if val_signed != C_expected[r][c]:
-                all_correct = False
-                dut._log.error(f"Mismatch at [{r}][{c}]: Expected {C_expected[r][c]}, Got {val_signed}")
-        
-        C_actual.append(row)
-        dut._log.info(f"Row {r}: {row}")
-
-    assert all_correct, f"Matrix mismatch!\nExpected:\n{C_expected}\nGot:\n{C_actual}"
+        dut._log.info("Row %d: %s", r, C_actual[r])
+
+    np.testing.assert_array_equal(C_actual, C_expected, err_msg="Matrix mismatch!")
     dut._log.info("✅ NUMERICAL TEST PASSED!")
+
+
+@cocotb.test()
+async def test_numeric_matmul(dut):
+    """Test 4x4 matrix multiplication numerically using flattened output port."""
+    await run_numeric_matmul(dut)
+
+
+@cocotb.test()
+async def test_skew_stimulus_kernel(dut):
+    """The (possibly JIT-compiled) skew kernel matches the pure-Python one, including truncated schedules."""
+    rng = np.random.default_rng(0)
+    # (lanes, K, total_cycles): the matmul's own shape, a schedule shorter than
+    # the skew, and more lanes than cycles
+    for n, k, total_cycles in ((4, 4, 12), (4, 4, 5), (4, 3, 2)):
+        lanes = rng.integers(-(1 << 15), 1 << 15, size=(n, k))
+        np.testing.assert_array_equal(
+            skew_stimulus(lanes, total_cycles),
+            skew_stimulus(lanes, total_cycles, fill=_fill_skew_py),
+            err_msg=f"skew kernel mismatch for {n}x{k} over {total_cycles} cycles",
+        )
@@ -9,6 +9,8 @@ Verifies:
 """
 
 import cocotb
+import numpy as np
+from cocotb.binary import BinaryValue
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, ClockCycles
 
@@ -16,32 +18,39 @@ from cocotb.triggers import RisingEdge, ClockCycles
 N = 4
 DATA_WIDTH = 16
 
+# Precomputed lane mask/shifts shared by every pack call
+DATA_MASK = (1 << DATA_WIDTH) - 1
+LANE_SHIFTS = [i * DATA_WIDTH for i in range(N)]
 
-def get_data_out(dut):
-    """Extract data_out array from flattened output."""
-    flat = dut.data_out_flat.value.integer
-    result = []
-    for i in range(N):
-        val = (flat >> (i * DATA_WIDTH)) & ((1 << DATA_WIDTH) - 1)
-        result.append(val)
-    return result
+
+def get_data_out(data_out_flat):
+    """Extract data_out array from the flattened output handle."""
+    # .buff is MSB-first; reverse the 16-bit lanes so row 0 comes first
+    lanes = np.frombuffer(data_out_flat.value.buff, dtype=">u2")[::-1]
+    return lanes[:N]
+
+
+def pack_data_in(values):
+    """Pack per-row values into the flattened data_in bus (row 0 in the LSBs)."""
+    packed = 0
+    for v, shift in zip(values, LANE_SHIFTS):
+        packed |= (v & DATA_MASK) << shift
+    return packed
 
 
 async def reset_dut(dut):
     """Reset the DUT."""
-    dut.rst_n.value = 0
-    dut.en.value = 0
-    dut.first_in.value = 0
-    dut.last_in.value = 0
-    for i in range(N):
-        dut.data_in[i].value = 0
+    dut.rst_n.setimmediatevalue(0)
+    dut.en.setimmediatevalue(0)
+    dut.first_in.setimmediatevalue(0)
+    dut.last_in.setimmediatevalue(0)
+    dut.data_in_flat.setimmediatevalue(0)
     await ClockCycles(dut.clk, 3)
     dut.rst_n.value = 1
     await RisingEdge(dut.clk)
 
 
-@cocotb.test()
-async def test_delay_pattern(dut):
+async def run_delay_pattern(dut):
     """Test that each row has the correct delay (row i -> i+1 cycles)."""
     clock = Clock(dut.clk, 10, units="ns")
     cocotb.start_soon(clock.start())
@@ -49,137 +58,171 @@ async def test_delay_pattern(dut):
     await reset_dut(dut)
     dut.en.value = 1
 
+    data_in_flat = dut.data_in_flat
+    data_out_flat = dut.data_out_flat
+    edge = RisingEdge(dut.clk)
+
     # Feed unique values to each row
     test_values = [0x1000 + i for i in range(N)]
-    for i in range(N):
-        dut.data_in[i].value = test_values[i]
+    data_in_flat.value = pack_data_in(test_values)
 
     # Collect outputs over time
-    outputs = []
+    outputs = np.zeros((N + 2, N), dtype=np.uint16)
     for cycle in range(N + 2):
-        await RisingEdge(dut.clk)
-        outputs.append(get_data_out(dut))
+        await edge
+        outputs[cycle] = get_data_out(data_out_flat)
 
     # Clear input
-    for i in range(N):
-        dut.data_in[i].value = 0
+    data_in_flat.value = 0
 
     # Verify timing: row i should output test_values[i] at cycle (i+1)
     # outputs[0] is after 1 clock from when we set data
     for row in range(N):
         expected_cycle = row + 1  # row 0 -> cycle 1, row 1 -> cycle 2, etc.
-        dut._log.info(f"Row {row}: expected at cycle {expected_cycle}, got {
-                      outputs[expected_cycle][row]:04x}, expected {test_values[row]:04x}")
-        assert outputs[expected_cycle][row] == test_values[row], \
-            f"Row {row} delay mismatch: expected {test_values[row]:04x} at cycle {
-                expected_cycle}, got {outputs[expected_cycle][row]:04x}"
+        actual = int(outputs[expected_cycle][row])
+        dut._log.info("Row %d: expected at cycle %d, got %04x, expected %04x",
+                      row, expected_cycle, actual, test_values[row])
+        assert actual == test_values[row], \
+            f"Row {row} delay mismatch: expected {test_values[row]:04x} at cycle " \
+            f"{expected_cycle}, got {actual:04x}"
 
     dut._log.info("✓ All row delays correct!")
 
 
 @cocotb.test()
-async def test_first_marker(dut):
+async def test_delay_pattern(dut):
+    """Test that each row has the correct delay (row i -> i+1 cycles)."""
+    await run_delay_pattern(dut)
+
+
+async def run_first_marker(dut):
     """Test that first_out fires 1 cycle after first_in."""
     clock = Clock(dut.clk, 10, units="ns")
     cocotb.start_soon(clock.start())
 
     await reset_dut(dut)
     dut.en.value = 1
+    edge = RisingEdge(dut.clk)
 
     # Pulse first_in
     dut.first_in.value = 1
-    await RisingEdge(dut.clk)
+    await edge
     dut.first_in.value = 0
 
     # first_out should be high now (1 cycle later)
-    await RisingEdge(dut.clk)
+    await edge
     assert dut.first_out.value == 1, "first_out should be 1 after 1 cycle"
 
     # Should be low on next cycle
-    await RisingEdge(dut.clk)
+    await edge
     assert dut.first_out.value == 0, "first_out should return to 0"
 
     dut._log.info("✓ first_out marker timing correct!")
 
 
 @cocotb.test()
-async def test_last_marker(dut):
+async def test_first_marker(dut):
+    """Test that first_out fires 1 cycle after first_in."""
+    await run_first_marker(dut)
+
+
+async def run_last_marker(dut):
     """Test that last_out fires N cycles after last_in."""
     clock = Clock(dut.clk, 10, units="ns")
     cocotb.start_soon(clock.start())
 
     await reset_dut(dut)
     dut.en.value = 1
+    edge = RisingEdge(dut.clk)
 
     # Pulse last_in
     dut.last_in.value = 1
-    await RisingEdge(dut.clk)
+    await edge
     dut.last_in.value = 0
 
-    # last_out should be low for N-1 cycles
-    for i in range(N - 1):
-        await RisingEdge(dut.clk)
-        assert dut.last_out.value == 0, f"last_out should be 0 at cycle {i+1}"
+    # last_out should still be low after N-1 cycles
+    await ClockCycles(dut.clk, N - 1)
+    assert dut.last_out.value == 0, f"last_out should be 0 at cycle {N - 1}"
 
     # last_out should be high at cycle N
-    await RisingEdge(dut.clk)
+    await edge
     assert dut.last_out.value == 1, f"last_out should be 1 at cycle {N}"
 
     # Should return to 0
-    await RisingEdge(dut.clk)
+    await edge
     assert dut.last_out.value == 0, "last_out should return to 0"
 
     dut._log.info(f"✓ last_out marker timing correct (N={N} cycles)!")
 
 
 @cocotb.test()
-async def test_diagonal_skew(dut):
+async def test_last_marker(dut):
+    """Test that last_out fires N cycles after last_in."""
+    await run_last_marker(dut)
+
+
+async def run_diagonal_skew(dut):
     """Test complete diagonal skewing pattern like a systolic array needs."""
     clock = Clock(dut.clk, 10, units="ns")
     cocotb.start_soon(clock.start())
 
     await reset_dut(dut)
     dut.en.value = 1
+    edge = RisingEdge(dut.clk)
 
     # Feed N columns of data (simulating matrix columns)
     # Column j has values [j*N + row for each row]
     columns = [[col * N + row for row in range(N)] for col in range(N)]
 
-    dut._log.info(f"Feeding {N} columns: {columns}")
+    # Pack every column into one bus word up front so the feed loop is one write per cycle
+    packed_cols = [pack_data_in(column) for column in columns]
+
+    dut._log.info("Feeding %d columns: %s", N, columns)
 
-    outputs = []
-    markers = []  # Capture markers at each cycle
+    first_in = dut.first_in
+    last_in = dut.last_in
+    data_in_flat = dut.data_in_flat
+    data_out_flat = dut.data_out_flat
+    first_out = dut.first_out
+    last_out = dut.last_out
+
+    # N feed cycles + N drain cycles, preallocated
+    outputs = np.zeros((2 * N, N), dtype=np.uint16)
+    markers = np.zeros((2 * N, 2), dtype=np.uint8)  # Capture markers at each cycle
+
+    # Reused for every column write instead of building a new BinaryValue each cycle
+    data_in_bv = BinaryValue(n_bits=len(data_in_flat), bigEndian=False)
 
     # Feed columns and collect outputs
     for col in range(N):
-        dut.first_in.value = 0
-        dut.last_in.value = 0
-        if col == 0:
-            dut.first_in.value = 1
-        if col == N-1:
-            dut.last_in.value = 1
-
-        for row in range(N):
-            dut.data_in[row].value = columns[col][row]
-        await RisingEdge(dut.clk)
-        outputs.append(get_data_out(dut))
-        markers.append((int(dut.first_out.value), int(dut.last_out.value)))
+        first_in.value = int(col == 0)
+        last_in.value = int(col == N - 1)
+        data_in_bv.integer = packed_cols[col]
+        data_in_flat.value = data_in_bv
+        await edge
+        outputs[col] = get_data_out(data_out_flat)
+        markers[col] = (int(first_out.value), int(last_out.value))
 
     # Continue collecting for N more cycles (pipeline drain)
-    dut.first_in.value = 0
-    dut.last_in.value = 0
-    for row in range(N):
-        dut.data_in[row].value = 0
+    first_in.value = 0
+    last_in.value = 0
+    data_in_flat.value = 0
 
-    for _ in range(N):
-        await RisingEdge(dut.clk)
-        outputs.append(get_data_out(dut))
-        markers.append((int(dut.first_out.value), int(dut.last_out.value)))
+    for t in range(N, 2 * N):
+        await edge
+        outputs[t] = get_data_out(data_out_flat)
+        markers[t] = (int(first_out.value), int(last_out.value))
 
     dut._log.info("Output timeline:")
     for t, (out, (f, l)) in enumerate(zip(outputs, markers)):
-        dut._log.info(f"  Cycle {t}: {out}, f: {f}, l: {l}")
+        dut._log.info("  Cycle %d: %s, f: %d, l: %d", t, out, f, l)
 
     # Check diagonal pattern: at time t, row r should have column[t - r - 1] if valid
     # The "diagonal" means row 0 gets col 0 at t=1, row 1 gets col 0 at t=2, etc.
     dut._log.info("✓ Diagonal skew test completed!")
+
+
+@cocotb.test()
+async def test_diagonal_skew(dut):
+    """Test complete diagonal skewing pattern like a systolic array needs."""
+    await run_diagonal_skew(dut)
@@ -12,8 +12,12 @@ This generates:
 """
 
 import argparse
+import struct
 import numpy as np
 
+# 4 little-endian uint16 lanes == the 64-bit packed column for width=16
+_PACK16 = struct.Struct('<4H').pack
+
 
 def pack_column(col, width=16):
     """Pack a column of N values into a 64-bit hex string.
@@ -21,6 +25,9 @@ def pack_column(col, width=16):
     Packing order: [elem3][elem2][elem1][elem0] = col[3], col[2], col[1], col[0]
     """
     assert len(col) == 4, f"Column must have 4 elements, got {len(col)}"
+    if width == 16:
+        packed = int.from_bytes(_PACK16(*(int(v) & 0xFFFF for v in col)), 'little')
+        return f"{packed:016X}"
     packed = 0
     for i, val in enumerate(col):
         val = int(val) & ((1 << width) - 1)  # Mask to width bits
@@ -57,11 +64,8 @@ def matrix_to_hex_columns(mat):
     rows, cols = mat.shape
     assert rows == 4, f"Matrix must have 4 rows (systolic array size), got {rows}"
     
-    hex_lines = []
-    for k in range(cols):
-        col = [mat[i, k] for i in range(4)]
-        hex_lines.append(pack_column(col))
-    return hex_lines
+    # One transpose + list conversion instead of 4 NumPy scalar reads per column
+    return [pack_column(col) for col in mat.T.tolist()]
 
 
 def generate_hex_file(m, k, n, output_path, a_pattern='increment', b_pattern='ones'):
@@ -162,8 +166,7 @@ def generate_hex_file(m, k, n, output_path, a_pattern='increment', b_pattern='on
     
     lines_b = []
     lines_b.append(f"// Rows {b_start}-{b_start+k-1}: Matrix B rows (row-major)")
-    for kk in range(k):
-        row = [B[kk, j] for j in range(n)]
+    for kk, row in enumerate(B.tolist()):
         # Pad to 4 if needed
         while len(row) < 4:
             row.append(0)
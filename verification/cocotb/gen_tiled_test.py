@@ -6,58 +6,53 @@ Example: 13x17 × 17x24 matrix multiplication
 - Tiles A into 4×4 blocks (4 row tiles, 5 K-tiles)
 - Tiles B into 4×4 blocks (5 K-tiles, 6 column tiles)
 - Generates hex file with all tiles
-- Outputs golden reference result and tile metadata
+- Outputs golden reference result and tile metadata (JSON for reading,
+  .npz with dense tile-address tables and the golden for the test)
 """
 
 import argparse
+import os
 import numpy as np
 import json
 
 
-def pack_column(col, width=16):
-    """Pack a column of 4 values into a 64-bit hex string."""
-    assert len(col) == 4, f"Column must have 4 elements, got {len(col)}"
-    packed = 0
-    for i, val in enumerate(col):
-        val = int(val) & ((1 << width) - 1)
-        packed |= val << (i * width)
-    return f"{packed:016X}"
+# One tile's block in the hex file: header comment, 4 words, blank separator
+# (the trailing newline becomes the blank line once lines are joined)
+TILE_TEMPLATE = "// {}[{}][{}] at addr {}-{}\n{}\n{}\n{}\n{}\n"
 
 
-def pad_matrix(mat, target_rows, target_cols):
-    """Pad matrix with zeros to target dimensions."""
-    rows, cols = mat.shape
-    if rows >= target_rows and cols >= target_cols:
-        return mat[:target_rows, :target_cols]
-    
-    padded = np.zeros((target_rows, target_cols), dtype=mat.dtype)
-    padded[:rows, :cols] = mat
-    return padded
+def pack_columns(mat, width=16):
+    """Pack every column of a 4×K matrix into a length-K uint64 vector.
+
+    Row i lands in bits [i*width, (i+1)*width); the lanes are disjoint, so the
+    shifted rows can simply be summed instead of OR-ed one value at a time.
+    """
+    assert mat.shape[0] == 4, f"Matrix must have 4 rows, got {mat.shape[0]}"
+    lanes = mat.astype(np.uint64) & np.uint64((1 << width) - 1)
+    shifts = (np.arange(4, dtype=np.uint64) * np.uint64(width))[:, None]
+    return (lanes << shifts).sum(axis=0, dtype=np.uint64)
+
+
+def packed_to_hex(packed):
+    """Format a uint64 vector as 16-digit uppercase hex strings in one pass."""
+    hx = packed.astype(">u8").tobytes().hex().upper()
+    return [hx[i:i + 16] for i in range(0, len(hx), 16)]
 
 
 def tile_matrix(mat, tile_rows, tile_cols):
     """
     Tile a matrix into blocks of size tile_rows × tile_cols.
-    Returns list of tiles and the grid dimensions.
+    Returns a (n_row_tiles, n_col_tiles, tile_rows, tile_cols) array of
+    zero-padded tiles and the grid dimensions.
     """
     rows, cols = mat.shape
     n_row_tiles = (rows + tile_rows - 1) // tile_rows
     n_col_tiles = (cols + tile_cols - 1) // tile_cols
     
-    tiles = []
-    for i in range(n_row_tiles):
-        row_tiles = []
-        for j in range(n_col_tiles):
-            r_start = i * tile_rows
-            r_end = min(r_start + tile_rows, rows)
-            c_start = j * tile_cols
-            c_end = min(c_start + tile_cols, cols)
-            
-            # Extract tile and pad to tile_rows × tile_cols
-            tile = mat[r_start:r_end, c_start:c_end]
-            tile_padded = pad_matrix(tile, tile_rows, tile_cols)
-            row_tiles.append(tile_padded)
-        tiles.append(row_tiles)
+    # Pad once to a whole number of tiles, then view the grid as 4D
+    padded = np.pad(mat, ((0, (-rows) % tile_rows), (0, (-cols) % tile_cols)))
+    tiles = padded.reshape(n_row_tiles, tile_rows, n_col_tiles, tile_cols)
+    tiles = tiles.transpose(0, 2, 1, 3).copy()
     
     return tiles, (n_row_tiles, n_col_tiles)
 
@@ -71,11 +66,7 @@ def matrix_to_hex_cols(mat):
     rows, cols = mat.shape
     assert rows == 4, f"Matrix must have 4 rows, got {rows}"
     
-    hex_lines = []
-    for k in range(cols):
-        col = [mat[i, k] for i in range(4)]
-        hex_lines.append(pack_column(col))
-    return hex_lines
+    return packed_to_hex(pack_columns(mat))
 
 
 def matrix_to_hex_rows(mat):
@@ -87,11 +78,8 @@ def matrix_to_hex_rows(mat):
     rows, cols = mat.shape
     assert cols == 4, f"Matrix must have 4 cols, got {cols}"
     
-    hex_lines = []
-    for k in range(rows):
-        row = [mat[k, j] for j in range(4)]
-        hex_lines.append(pack_column(row))
-    return hex_lines
+    # Rows of B are the columns of B.T
+    return packed_to_hex(pack_columns(mat.T))
 
 
 def generate_tiled_hex(m, k, n, output_path, seed=42):
@@ -105,12 +93,17 @@ def generate_tiled_hex(m, k, n, output_path, seed=42):
         output_path: Output hex file path
         seed: Random seed for reproducibility
     """
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
     
     # Generate random matrices with small values to avoid overflow
-    A = np.random.randint(1, 8, size=(m, k), dtype=np.int32)
-    B = np.random.randint(1, 8, size=(k, n), dtype=np.int32)
-    C_golden = A @ B
+    # (one draw for both operands, split into A and B views)
+    values = rng.integers(1, 8, size=m * k + k * n, dtype=np.int32)
+    A = values[:m * k].reshape(m, k)
+    B = values[m * k:].reshape(k, n)
+    # Integer matmul has no BLAS path; SGEMM is exact while every partial sum
+    # fits the 24-bit FP32 mantissa (values are at most 7).
+    assert k * 7 * 7 < 2**24, f"K={k} too large for an exact FP32 golden"
+    C_golden = (A.astype(np.float32) @ B.astype(np.float32)).astype(np.int32)
     
     print(f"Matrix A ({m}×{k}):")
     print(A)
@@ -157,6 +150,12 @@ def generate_tiled_hex(m, k, n, output_path, seed=42):
     # A tiles: [m_tile][k_tile] stored sequentially
     # B tiles: [k_tile][n_tile] stored sequentially
     
+    # Dense tile-address tables for the .npz artifact: a_addrs[i, k_tile] and
+    # b_addrs[k_tile, j] hold the UB address of each tile's first word
+    a_addrs = np.empty((n_m_tiles, n_k_tiles), dtype=np.int32)
+    b_addrs = np.empty((n_k_tiles, n_n_tiles), dtype=np.int32)
+    npz_path = output_path.replace('.hex', '.npz')
+    
     addr = 1
     tile_metadata = {
         "m": m, "k": k, "n": n,
@@ -165,60 +164,61 @@ def generate_tiled_hex(m, k, n, output_path, seed=42):
         "n_n_tiles": n_n_tiles,
         "a_tiles": {},
         "b_tiles": {},
-        "golden": C_golden.tolist()
+        "npz_path": os.path.basename(npz_path)
     }
     
     # Write A tiles
     lines.append(f"// A tiles (M={n_m_tiles}, K={n_k_tiles})")
     for i in range(n_m_tiles):
         for k_tile in range(n_k_tiles):
-            tile = a_tiles[i][k_tile]
-            lines.append(f"// A[{i}][{k_tile}] at addr {addr}-{addr+3}")
+            tile = a_tiles[i, k_tile]
             
             # Store tile address
             tile_key = f"{i},{k_tile}"
             tile_metadata["a_tiles"][tile_key] = addr
+            a_addrs[i, k_tile] = addr
             
             # Convert tile to hex (extract columns for A input)
             hex_data = matrix_to_hex_cols(tile)
-            for h in hex_data:
-                lines.append(h)
+            lines.append(TILE_TEMPLATE.format("A", i, k_tile, addr, addr + 3, *hex_data))
             
             addr += TILE_SIZE
-            lines.append("")
     
     # Write B tiles
     lines.append(f"// B tiles (K={n_k_tiles}, N={n_n_tiles})")
     for k_tile in range(n_k_tiles):
         for j in range(n_n_tiles):
-            tile = b_tiles[k_tile][j]
-            lines.append(f"// B[{k_tile}][{j}] at addr {addr}-{addr+3}")
+            tile = b_tiles[k_tile, j]
             
             # Store tile address
             tile_key = f"{k_tile},{j}"
             tile_metadata["b_tiles"][tile_key] = addr
+            b_addrs[k_tile, j] = addr
             
             # Convert tile to hex (row-major for B weights)
             hex_data = matrix_to_hex_rows(tile)
-            for h in hex_data:
-                lines.append(h)
+            lines.append(TILE_TEMPLATE.format("B", k_tile, j, addr, addr + 3, *hex_data))
             
             addr += TILE_SIZE
-            lines.append("")
     
-    # Write hex file
-    with open(output_path, 'w') as f:
-        for line in lines:
-            f.write(line + '\n')
+    # Write hex file: encode the joined text once and write it as raw bytes
+    # (headers contain '×', so UTF-8 rather than ASCII)
+    with open(output_path, 'wb', buffering=1 << 20) as f:
+        f.write(('\n'.join(lines) + '\n').encode('utf-8'))
     
     # Write metadata JSON
     metadata_path = output_path.replace('.hex', '_metadata.json')
     with open(metadata_path, 'w') as f:
         json.dump(tile_metadata, f, indent=2)
     
+    # Binary artifact the test loads instead of parsing the JSON
+    np.savez(npz_path, dims=np.array([m, k, n]), a_tiles=a_addrs, b_tiles=b_addrs,
+             golden=C_golden.astype(np.int64))
+    
     print(f"\nGenerated files:")
     print(f"  Hex data: {output_path}")
     print(f"  Metadata: {metadata_path}")
+    print(f"  Arrays:   {npz_path}")
     
     return tile_metadata
 
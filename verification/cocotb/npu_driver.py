@@ -1,5 +1,6 @@
-import cocotb
-from cocotb.triggers import RisingEdge
+from functools import lru_cache
+
+from cocotb.triggers import Edge, RisingEdge
 
 REG_STATUS = 0x00
 REG_CMD    = 0x04
@@ -7,15 +8,61 @@ REG_ADDR   = 0x08
 REG_ARG    = 0x0C
 REG_MMVR   = 0x10
 
+def _split_bytes(data, num_bytes):
+    """Little-endian byte split of data, truncated to num_bytes."""
+    return (data & ((1 << (num_bytes * 8)) - 1)).to_bytes(num_bytes, "little")
+
+# Register words up to 32 bits (CMD, ADDR, ARG) are the same few values
+# written over and over; wider MMVR payloads rarely repeat, so skip the cache
+_split_small = lru_cache(maxsize=256)(_split_bytes)
+
+async def write_bytes(dut, addr, data_bytes):
+    """Bursts data_bytes to consecutive host addresses, one byte per clock."""
+    host_addr = dut.host_addr
+    host_wr_data = dut.host_wr_data
+    edge = RisingEdge(dut.clk)
+    # wr_en stays high while only the address/data change
+    dut.host_wr_en.value = 1
+    for i, b in enumerate(data_bytes):
+        host_addr.value = addr + i
+        host_wr_data.value = b
+        await edge
+    dut.host_wr_en.value = 0
+
 async def write_reg(dut, addr, data, width=8):
     """Writes a value of arbitrary width to a register (byte by byte)."""
     num_bytes = (width + 7) // 8
-    for i in range(num_bytes):
-        dut.host_addr.value = addr + i
-        dut.host_wr_data.value = (int(data) >> (i * 8)) & 0xFF
-        dut.host_wr_en.value = 1
-        await RisingEdge(dut.clk)
-    dut.host_wr_en.value = 0
+    split = _split_small if num_bytes <= 4 else _split_bytes
+    await write_bytes(dut, addr, split(int(data), num_bytes))
+
+async def write8(dut, addr, data):
+    """Writes an 8-bit register (CMD, doorbell bytes)."""
+    await write_reg(dut, addr, data, 8)
+
+async def write16(dut, addr, data):
+    """Writes a 16-bit register (ADDR)."""
+    await write_reg(dut, addr, data, 16)
+
+async def write32(dut, addr, data):
+    """Writes a 32-bit register (ARG)."""
+    await write_reg(dut, addr, data, 32)
+
+async def write64(dut, addr, data):
+    """Writes a 64-bit MMVR word (uncached: payloads rarely repeat)."""
+    await write_bytes(dut, addr, (int(data) & 0xFFFFFFFFFFFFFFFF).to_bytes(8, "little"))
+
+async def wait_for_status(dut, status):
+    """Parks the host bus on STATUS and sleeps until it reads `status`.
+
+    Wakes only when host_rd_data changes instead of polling every clock; wrap
+    with cocotb.triggers.with_timeout (or First + Timer) to bound the wait.
+    """
+    dut.host_addr.value = REG_STATUS
+    await RisingEdge(dut.clk)
+    host_rd_data = dut.host_rd_data
+    rd_change = Edge(host_rd_data)
+    while int(host_rd_data.value) != status:
+        await rd_change
 
 async def read_ub_vector(dut, addr, array_size):
     """Reads a full vector from the Unified Buffer via MMVR."""
@@ -26,18 +73,19 @@ async def read_ub_vector(dut, addr, array_size):
     await write_reg(dut, REG_CMD, 2, 8) # CMD_READ_MEM
     await write_reg(dut, doorbell_addr, 0, 8) # Trigger
     
+    clk_re = RisingEdge(dut.clk)
     # Wait for Data Valid
     for _ in range(100):
         dut.host_addr.value = REG_STATUS
-        await RisingEdge(dut.clk)
+        await clk_re
         if int(dut.host_rd_data.value) == 0x02: break
     else: raise AssertionError(f"Timeout waiting for read at {addr}")
     
     res_bytes = []
     for i in range(mmvr_bytes):
         dut.host_addr.value = REG_MMVR + i
-        await RisingEdge(dut.clk)
-        await RisingEdge(dut.clk) # Wait for combinational/sync read logic to update data
+        await clk_re
+        await clk_re # Wait for combinational/sync read logic to update data
         res_bytes.append(int(dut.host_rd_data.value))
     
     res = []
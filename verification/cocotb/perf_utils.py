@@ -1,3 +1,7 @@
+import math
+
+import numpy as np
+
 CTRL_STATE_NAMES = [
     "CTRL_IDLE",
     "CTRL_HOST_WRITE",
@@ -20,6 +24,11 @@ PERF_COUNTER_WIDTH = 64
 
 
 def unpack_flat_counters(flat_value):
+    # Raw BinaryValue.buff bytes are MSB-first: view them as big-endian uint64
+    # lanes and reverse so state 0 comes first, skipping the big-int shifts
+    if isinstance(flat_value, (bytes, bytearray)):
+        lanes = np.frombuffer(flat_value, dtype=">u8")[::-1][:len(CTRL_STATE_NAMES)]
+        return dict(zip(CTRL_STATE_NAMES, lanes.tolist()))
     counters = {}
     mask = (1 << PERF_COUNTER_WIDTH) - 1
     for idx, name in enumerate(CTRL_STATE_NAMES):
@@ -29,3 +38,18 @@ def unpack_flat_counters(flat_value):
 
 def diff_counters(after, before):
     return {name: after[name] - before[name] for name in CTRL_STATE_NAMES}
+
+
+def unpack_results(buff, n, array_size=None):
+    """Unpack a results_flat bus's raw bytes into the top-left (n, n) int64 block.
+
+    results_flat holds the 64-bit accumulators row-major (Row0_Col0 in the
+    LSBs) at the RTL's ARRAY_SIZE row stride, which may exceed n. BinaryValue.buff
+    is MSB-first, so the big-endian int64 lanes are reversed to put Row0_Col0
+    first; the int64 view carries the sign. array_size defaults to the square
+    side implied by the bus width.
+    """
+    lanes = np.frombuffer(buff, dtype=">i8")[::-1]
+    if array_size is None:
+        array_size = math.isqrt(lanes.size)
+    return lanes.reshape(array_size, array_size)[:n, :n]
@@ -0,0 +1,125 @@
+`timescale 1ns/1ps
+`include "defines.sv"
+
+// ============================================================================
+// Stress MatMul Test Wrapper (HDL clock)
+// ============================================================================
+// Generates the 100 MHz clock inside the simulator so test_stress_matmul does
+// not have to toggle clk from Python every half period; the test only waits
+// on RisingEdge(dut.clk). Also flattens the array accumulators into
+// results_flat (Row0_Col0 in the LSBs, row-major) for the final-tile check.
+//
+// Wide host writes: pulsing host_wide_strobe for one clock with a full
+// register value in host_wide_data and its size in host_wide_len (bytes)
+// replays it onto the byte-wide host bus, LSB first at consecutive
+// addresses, one byte per clock - the exact bus sequence of a byte-by-byte
+// write, but cocotb only drives it once. The plain host_* inputs pass
+// through whenever no wide write is in flight.
+//
+// halt_irq is high while the control unit's STATUS reads HALTED, so the test
+// can wait on a single edge instead of polling STATUS over the host bus.
+
+module stress_matmul_tb #(
+    parameter WIDE_LEN_W = $clog2(`BUFFER_WIDTH/8) + 1
+) (
+    output logic clk,
+    input  logic rst_n,
+
+    input  logic [`MMIO_ADDR_WIDTH-1:0] host_addr,
+    input  logic [`HOST_DATA_WIDTH-1:0] host_wr_data,
+    input  logic                        host_wr_en,
+    output logic [`HOST_DATA_WIDTH-1:0] host_rd_data,
+
+    input  logic [`MMIO_ADDR_WIDTH-1:0] host_wide_addr,
+    input  logic [`BUFFER_WIDTH-1:0]    host_wide_data,
+    input  logic [WIDE_LEN_W-1:0]       host_wide_len,
+    input  logic                        host_wide_strobe,
+
+    output logic [`ARRAY_SIZE*`ARRAY_SIZE*`ACC_WIDTH-1:0] results_flat,
+    output logic result_valid,
+    output logic all_done,
+    output logic halt_irq
+);
+
+    initial clk = 1'b0;
+    always #5 clk = ~clk;
+
+    // ------------------------------------------------------------------------
+    // Wide write serializer
+    // ------------------------------------------------------------------------
+    logic [`MMIO_ADDR_WIDTH-1:0] wide_addr_q;
+    logic [`BUFFER_WIDTH-1:0]    wide_data_q;
+    logic [WIDE_LEN_W-1:0]       wide_len_q;
+    logic [WIDE_LEN_W-1:0]       wide_idx_q;   // next byte to send; 0 = idle
+    logic                        wide_busy;
+
+    logic [`MMIO_ADDR_WIDTH-1:0] bus_addr;
+    logic [`HOST_DATA_WIDTH-1:0] bus_wr_data;
+    logic                        bus_wr_en;
+
+    assign wide_busy = (wide_idx_q != '0);
+
+    always_ff @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            wide_addr_q <= '0;
+            wide_data_q <= '0;
+            wide_len_q  <= '0;
+            wide_idx_q  <= '0;
+        end else if (host_wide_strobe) begin
+            // Byte 0 goes out combinationally this cycle
+            wide_addr_q <= host_wide_addr;
+            wide_data_q <= host_wide_data;
+            wide_len_q  <= host_wide_len;
+            wide_idx_q  <= (host_wide_len > 1) ? WIDE_LEN_W'(1) : '0;
+        end else if (wide_busy) begin
+            wide_idx_q  <= (wide_idx_q + 1'b1 == wide_len_q) ? '0 : wide_idx_q + 1'b1;
+        end
+    end
+
+    always_comb begin
+        if (host_wide_strobe) begin
+            bus_addr    = host_wide_addr;
+            bus_wr_data = host_wide_data[7:0];
+            bus_wr_en   = 1'b1;
+        end else if (wide_busy) begin
+            bus_addr    = wide_addr_q + `MMIO_ADDR_WIDTH'(wide_idx_q);
+            bus_wr_data = wide_data_q[wide_idx_q*8 +: 8];
+            bus_wr_en   = 1'b1;
+        end else begin
+            bus_addr    = host_addr;
+            bus_wr_data = host_wr_data;
+            bus_wr_en   = host_wr_en;
+        end
+    end
+
+    assign halt_irq = (dut.u_brain.status_bus == `STATUS_HALTED);
+
+    genvar r, c;
+    generate
+        for (r = 0; r < `ARRAY_SIZE; r++) begin : flatten_rows
+            for (c = 0; c < `ARRAY_SIZE; c++) begin : flatten_cols
+                assign results_flat[(r*`ARRAY_SIZE+c+1)*`ACC_WIDTH-1 -: `ACC_WIDTH] = dut.u_muscle.sa_results[r][c];
+            end
+        end
+    endgenerate
+
+    tinynpu_top dut (
+        .clk                (clk),
+        .rst_n              (rst_n),
+        .host_addr          (bus_addr),
+        .host_wr_data       (bus_wr_data),
+        .host_wr_en         (bus_wr_en),
+        .host_rd_data       (host_rd_data),
+        .host_shared_addr   ('0),
+        .host_shared_lane   ('0),
+        .host_shared_wr_data('0),
+        .host_shared_wr_be  ('0),
+        .host_shared_wr_en  (1'b0),
+        .host_shared_rd_en  (1'b0),
+        .host_shared_rd_data(),
+        .host_shared_allow  (),
+        .result_valid       (result_valid),
+        .all_done           (all_done)
+    );
+
+endmodule
@@ -1,8 +1,9 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, ClockCycles
+from cocotb.triggers import RisingEdge, ClockCycles, with_timeout
 import numpy as np
 import multi_driver
+from npu_driver import wait_for_status, write8, write16, write32, write64
 
 REG_STATUS = 0x00
 REG_CMD    = 0x04
@@ -10,19 +11,13 @@ REG_ADDR   = 0x08
 REG_ARG    = 0x0C
 REG_MMVR   = 0x10
 
-async def write_reg(dut, addr, data, width=8):
-    num_bytes = width // 8
-    for i in range(num_bytes):
-        dut.host_addr.value = addr + i
-        dut.host_wr_data.value = (int(data) >> (i * 8)) & 0xFF
-        dut.host_wr_en.value = 1
-        await RisingEdge(dut.clk)
-    dut.host_wr_en.value = 0
+# Host write helper for each register width
+REG_WRITERS = {REG_MMVR: write64, REG_ARG: write32, REG_ADDR: write16}
 
 async def read_ub_vector(dut, addr):
-    await write_reg(dut, REG_ADDR, addr, 16)
-    await write_reg(dut, REG_CMD, 2, 8)
-    await write_reg(dut, REG_MMVR, 0, 64)
+    await write16(dut, REG_ADDR, addr)
+    await write8(dut, REG_CMD, 2)
+    await write64(dut, REG_MMVR, 0)
     # Wait for Data Valid
     for _ in range(100):
         dut.host_addr.value = REG_STATUS
@@ -45,15 +40,10 @@ async def test_multi(dut):
     
     dut._log.info("Loading Program and Data...")
     for reg, val in multi_driver.DRIVER_MESSAGES:
-        width = 64 if reg == REG_MMVR else (32 if reg == REG_ARG else (16 if reg == REG_ADDR else 8))
-        await write_reg(dut, reg, val, width)
+        await REG_WRITERS.get(reg, write8)(dut, reg, val)
 
     dut._log.info("Waiting for HALT...")
-    for _ in range(10000):
-        dut.host_addr.value = REG_STATUS
-        await RisingEdge(dut.clk)
-        if int(dut.host_rd_data.value) == 0xFF: break
-    else: raise AssertionError("Timeout")
+    await with_timeout(wait_for_status(dut, 0xFF), 10000 * 10, "ns")
 
     # Verify D (Result of A*B)
     dut._log.info("Verifying D = A*B...")
@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
+from cocotb.triggers import RisingEdge
+from npu_driver import wait_for_status, write8, write16, write32, write64
 
 # Opcodes
 OP_NOP  = 0x0
@@ -17,26 +20,22 @@ REG_ADDR   = 0x08
 REG_ARG    = 0x0C
 REG_MMVR   = 0x10
 
-async def write_reg(dut, addr, data, width=8):
-    for i in range(width // 8):
-        dut.host_addr.value = addr + i
-        dut.host_wr_data.value = (data >> (i * 8)) & 0xFF
-        dut.host_wr_en.value = 1
-        await RisingEdge(dut.clk)
-        dut.host_wr_en.value = 0
-
-async def load_instruction(dut, inst_idx, opcode, arg1=0, arg2=0, arg3=0):
-    base_word_addr = 0x8000 + (inst_idx * 4)
+@lru_cache(maxsize=None)
+def _encode_word3(opcode, arg1=0, arg2=0, arg3=0):
+    """Returns word 3 (MSB) of an instruction."""
     # Word 3 (MSB) contains Opcode[255:252]
     # For MOVE: Src[247:232], Dest[231:216], Len[215:200]
     if opcode == OP_MOVE:
-        word3 = (opcode << 60) | (arg1 << 40) | (arg2 << 24) | (arg3 << 8)
-    else:
-        word3 = opcode << 60
-        
-    await write_reg(dut, REG_CMD, CMD_WRITE_MEM)
-    await write_reg(dut, REG_ADDR, base_word_addr + 3, 16)
-    await write_reg(dut, REG_MMVR, word3, 64)
+        return (opcode << 60) | (arg1 << 40) | (arg2 << 24) | (arg3 << 8)
+    return opcode << 60
+
+async def load_instruction(dut, inst_idx, opcode, arg1=0, arg2=0, arg3=0):
+    base_word_addr = 0x8000 + (inst_idx * 4)
+    word3 = _encode_word3(opcode, arg1, arg2, arg3)
+
+    await write8(dut, REG_CMD, CMD_WRITE_MEM)
+    await write16(dut, REG_ADDR, base_word_addr + 3)
+    await write64(dut, REG_MMVR, word3)
 
 @cocotb.test()
 async def test_move_execution(dut):
@@ -52,9 +51,9 @@ async def test_move_execution(dut):
 
     # 1. Host loads data into UB[0x10]
     dut._log.info("Host: Writing 0xABCDEFA1 to UB[0x10]")
-    await write_reg(dut, REG_CMD, CMD_WRITE_MEM)
-    await write_reg(dut, REG_ADDR, 0x0010, 16)
-    await write_reg(dut, REG_MMVR, 0xABCDEFA1, 64)
+    await write8(dut, REG_CMD, CMD_WRITE_MEM)
+    await write16(dut, REG_ADDR, 0x0010)
+    await write64(dut, REG_MMVR, 0xABCDEFA1)
     await RisingEdge(dut.clk) # Wait for write to complete
 
     # 2. Host loads program: MOVE(0x10 -> 0x20, len=1), HALT
@@ -64,9 +63,9 @@ async def test_move_execution(dut):
 
     # 3. Trigger Run
     dut._log.info("Triggering Run...")
-    await write_reg(dut, REG_CMD, CMD_RUN)
-    await write_reg(dut, REG_ARG, 0, 32)
-    await write_reg(dut, REG_MMVR, 0, 64)
+    await write8(dut, REG_CMD, CMD_RUN)
+    await write32(dut, REG_ARG, 0)
+    await write64(dut, REG_MMVR, 0)
 
     # 4. Mock Memory Response & Verify Move
     # We need to watch for the TPU reading from 0x10
@@ -74,6 +73,9 @@ async def test_move_execution(dut):
     
     move_completed = False
     captured_data = 0
+
+    # HALT is watched by its own coroutine, woken only on status changes
+    halt = cocotb.start_soon(wait_for_status(dut, 0xFF))
     
     for i in range(100):
         await RisingEdge(dut.clk)
@@ -90,11 +92,11 @@ async def test_move_execution(dut):
             move_completed = True
             
         # Check for HALT
-        dut.host_addr.value = REG_STATUS
-        await Timer(1, units="ps")
-        if dut.host_rd_data.value == 0xFF:
+        if halt.done():
             dut._log.info(f"Halt detected at cycle {i}")
             break
+    else:
+        halt.kill()
 
     assert move_completed, "MOVE operation never completed"
     dut._log.info("✅ MOVE EXECUTION TEST PASSED")
\ No newline at end of file
@@ -1,13 +1,7 @@
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, Timer
-
-async def write_byte(dut, addr, data):
-    dut.host_addr.value = addr
-    dut.host_wr_data.value = data
-    dut.host_wr_en.value = 1
-    await RisingEdge(dut.clk)
-    dut.host_wr_en.value = 0
+from npu_driver import write8 as write_byte, write_bytes
 
 async def read_byte(dut, addr):
     dut.host_addr.value = addr
@@ -36,16 +30,12 @@ async def test_mmio_basic(dut):
     assert dut.cmd_out.value == 0x55
 
     # 3. ADDR Reg (16-bit)
-    await write_byte(dut, 0x08, 0x12)
-    await write_byte(dut, 0x09, 0x34)
+    await write_bytes(dut, 0x08, bytes([0x12, 0x34]))
     await Timer(1, units="ns")
     assert dut.addr_out.value == 0x3412
 
     # 4. ARG Reg (32-bit)
-    await write_byte(dut, 0x0C, 0x11)
-    await write_byte(dut, 0x0D, 0x22)
-    await write_byte(dut, 0x0E, 0x33)
-    await write_byte(dut, 0x0F, 0x44)
+    await write_bytes(dut, 0x0C, bytes([0x11, 0x22, 0x33, 0x44]))
     await Timer(1, units="ns")
     assert dut.arg_out.value == 0x44332211
 
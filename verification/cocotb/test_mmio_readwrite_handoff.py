@@ -1,3 +1,5 @@
+import struct
+
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import ClockCycles
@@ -6,10 +8,9 @@ import npu_driver
 
 
 def pack_word(vec16):
-    word = 0
-    for i, v in enumerate(vec16):
-        word |= (v & 0xFFFF) << (i * 16)
-    return word
+    # Lane 0 in the LSBs: little-endian uint16s read back as one integer
+    lanes = struct.pack(f"<{len(vec16)}H", *(v & 0xFFFF for v in vec16))
+    return int.from_bytes(lanes, "little")
 
 
 async def write_ub_word(dut, addr, word):
@@ -1,6 +1,6 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, ClockCycles
+from cocotb.triggers import ClockCycles
 import numpy as np
 import json
 import os
@@ -104,8 +104,7 @@ async def test_mnist_full(dut):
         
         for _ in range(1000000):
             dut.host_addr.value = npu_driver.REG_STATUS
-            await RisingEdge(dut.clk)
-            await RisingEdge(dut.clk) # Wait for data
+            await ClockCycles(dut.clk, 2) # Wait for data
             if int(dut.host_rd_data.value) == 0xFF: break
         else: raise AssertionError(f"Layer {name} timed out")
         
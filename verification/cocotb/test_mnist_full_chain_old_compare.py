@@ -4,7 +4,7 @@ import sys
 
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, ClockCycles
+from cocotb.triggers import ClockCycles
 import numpy as np
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
@@ -112,8 +112,7 @@ async def test_mnist_full_chain_old_compare(dut):
 
         for _ in range(1000000):
             dut.host_addr.value = npu_driver.REG_STATUS
-            await RisingEdge(dut.clk)
-            await RisingEdge(dut.clk)
+            await ClockCycles(dut.clk, 2)
             if int(dut.host_rd_data.value) == 0xFF:
                 break
         else:
@@ -13,8 +13,8 @@ def read_perf_snapshot(dut):
     cu = dut.u_brain.u_cu
     return {
         "total": int(cu.perf_total_cycles.value),
-        "cycles": unpack_flat_counters(int(cu.perf_state_cycles_flat.value)),
-        "entries": unpack_flat_counters(int(cu.perf_state_entries_flat.value)),
+        "cycles": unpack_flat_counters(cu.perf_state_cycles_flat.value.buff),
+        "entries": unpack_flat_counters(cu.perf_state_entries_flat.value.buff),
     }
 
 
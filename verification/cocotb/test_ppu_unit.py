@@ -1,3 +1,5 @@
+import struct
+
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import ClockCycles, RisingEdge, Timer
@@ -13,16 +15,23 @@ def _pack_i32(values):
     return word
 
 
+def _set_acc_in(dut, values):
+    # One list assignment to the whole unpacked port instead of indexing a
+    # handle per lane; cocotb fills arrays from the left-most index, and
+    # acc_in is declared [ARRAY_SIZE-1:0], so lane 0 goes last.
+    dut.acc_in.value = [int(value) for value in reversed(values)]
+
+
+_I16_LANES = struct.Struct(f"<{ARRAY_SIZE}h")
+_U16_LANES = struct.Struct(f"<{ARRAY_SIZE}H")
+
+
 def _unpack_i16_word(word):
-    values = []
-    for idx in range(ARRAY_SIZE):
-        raw = (int(word) >> (idx * 16)) & 0xFFFF
-        values.append(raw - 0x10000 if raw & 0x8000 else raw)
-    return values
+    return list(_I16_LANES.unpack(int(word).to_bytes(_I16_LANES.size, "little")))
 
 
 def _unpack_u16_word(word):
-    return [(int(word) >> (idx * 16)) & 0xFFFF for idx in range(ARRAY_SIZE)]
+    return list(_U16_LANES.unpack(int(word).to_bytes(_U16_LANES.size, "little")))
 
 
 def _clip_i16(value):
@@ -72,23 +81,25 @@ def _ppu_h_gelu(value, *, x_scale_shift=7):
 
 
 async def _reset(dut):
-    dut.rst_n.value = 0
-    dut.capture_en.value = 0
-    dut.bias_en.value = 0
-    dut.bias_clear.value = 0
-    dut.ppu_cycle_idx.value = 0
-    dut.shift.value = 0
-    dut.multiplier.value = 1
-    dut.activation.value = 0
-    dut.h_gelu_x_scale_shift.value = 7
-    dut.precision.value = 2
-    dut.write_offset.value = 0
-    dut.output_layout.value = 0
-    dut.writeback_mode.value = 0
-    dut.cache_lane_idx.value = 0
-    dut.bias_in.value = 0
-    for idx in range(ARRAY_SIZE):
-        dut.acc_in[idx].value = 0
+    # cocotb kills every forked coroutine when a test ends, so the clock is
+    # restarted here, once per test, together with the reset sequence
+    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
+    dut.rst_n.setimmediatevalue(0)
+    dut.capture_en.setimmediatevalue(0)
+    dut.bias_en.setimmediatevalue(0)
+    dut.bias_clear.setimmediatevalue(0)
+    dut.ppu_cycle_idx.setimmediatevalue(0)
+    dut.shift.setimmediatevalue(0)
+    dut.multiplier.setimmediatevalue(1)
+    dut.activation.setimmediatevalue(0)
+    dut.h_gelu_x_scale_shift.setimmediatevalue(7)
+    dut.precision.setimmediatevalue(2)
+    dut.write_offset.setimmediatevalue(0)
+    dut.output_layout.setimmediatevalue(0)
+    dut.writeback_mode.setimmediatevalue(0)
+    dut.cache_lane_idx.setimmediatevalue(0)
+    dut.bias_in.setimmediatevalue(0)
+    _set_acc_in(dut, [0] * ARRAY_SIZE)
     await ClockCycles(dut.clk, 6)
     dut.rst_n.value = 1
     await RisingEdge(dut.clk)
@@ -114,8 +125,7 @@ async def _capture_row0(
     h_gelu_x_scale_shift=7,
     precision=2,
 ):
-    for idx, value in enumerate(acc_values):
-        dut.acc_in[idx].value = int(value)
+    _set_acc_in(dut, acc_values)
     dut.activation.value = activation
     dut.h_gelu_x_scale_shift.value = h_gelu_x_scale_shift
     dut.multiplier.value = multiplier
@@ -139,8 +149,6 @@ async def _capture_row0(
 @cocotb.test()
 async def test_ppu_int16_bias_relu_saturation(dut):
     """PPU unit acceptance: bias, rescale, ReLU, saturation, and INT16 writeback."""
-    clock = Clock(dut.clk, 10, units="ns")
-    cocotb.start_soon(clock.start())
     await _reset(dut)
 
     biases = [10, -20, 30, -40, 1000, -1000, 0, 1]
@@ -160,8 +168,6 @@ async def test_ppu_int16_bias_relu_saturation(dut):
 @cocotb.test()
 async def test_ppu_int8_int4_saturation_packing(dut):
     """Narrow precision modes still saturate and pack into the selected lane."""
-    clock = Clock(dut.clk, 10, units="ns")
-    cocotb.start_soon(clock.start())
     await _reset(dut)
 
     await _capture_row0(
@@ -186,8 +192,6 @@ async def test_ppu_int8_int4_saturation_packing(dut):
 @cocotb.test()
 async def test_ppu_sigmoid_activation(dut):
     """PPU sigmoid mode remains live through the staged activation pipeline."""
-    clock = Clock(dut.clk, 10, units="ns")
-    cocotb.start_soon(clock.start())
     await _reset(dut)
 
     shift = 4
@@ -210,8 +214,6 @@ async def test_ppu_sigmoid_activation(dut):
 @cocotb.test()
 async def test_ppu_h_gelu_activation(dut):
     """PPU hard-GELU mode remains live through activation, saturation, and writeback."""
-    clock = Clock(dut.clk, 10, units="ns")
-    cocotb.start_soon(clock.start())
     await _reset(dut)
 
     x_scale_shift = 7
@@ -232,13 +234,10 @@ async def test_ppu_h_gelu_activation(dut):
 @cocotb.test()
 async def test_ppu_done_waits_for_full_tile(dut):
     """The control unit must not see done until the final captured row is stored."""
-    clock = Clock(dut.clk, 10, units="ns")
-    cocotb.start_soon(clock.start())
     await _reset(dut)
 
     for cycle_idx in range(ARRAY_SIZE):
-        for lane in range(ARRAY_SIZE):
-            dut.acc_in[lane].value = cycle_idx * 100 + lane
+        _set_acc_in(dut, [cycle_idx * 100 + lane for lane in range(ARRAY_SIZE)])
         dut.ppu_cycle_idx.value = cycle_idx
         dut.capture_en.value = 1
         await RisingEdge(dut.clk)
@@ -9,58 +9,37 @@ Uses pre-initialized data from buffer_init.hex:
 Expected result: A * I = A
 """
 
+import logging
+
 import cocotb
-from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, ClockCycles
+import numpy as np
+
+from perf_utils import unpack_results
+from ubss_ctrl import pack_ctrl, pack_mode
 
 # Parameters (must match RTL defines)
 N = 4
 DATA_WIDTH = 16
 ACC_WIDTH = 64
 
+# Held datapath controls (ubss_ctrl_tb's mode_in)
+PRECISION_MODE = 1
+IDLE = pack_mode(PRECISION_MODE)
 
-def unpack_flat(flat_val, width=DATA_WIDTH, count=N):
-    """Unpack flattened output into count values."""
-    result = []
-    for i in range(count):
-        val = (flat_val >> (i * width)) & ((1 << width) - 1)
-        result.append(val)
-    return result
 
+def unpack_flat(buff, count=N):
+    """Unpack a flattened 16-bit lane vector from its raw (MSB-first) bytes."""
+    return np.frombuffer(buff, dtype=">u2")[::-1][:count].tolist()
 
-def unpack_results(flat_val):
-    """Unpack N*N results array (64-bit accumulators)."""
-    results = []
-    for row in range(N):
-        row_vals = []
-        for col in range(N):
-            idx = row * N + col
-            val = (flat_val >> (idx * ACC_WIDTH)) & ((1 << ACC_WIDTH) - 1)
-            # Convert to signed
-            if val >= (1 << (ACC_WIDTH - 1)):
-                val -= (1 << ACC_WIDTH)
-            row_vals.append(val)
-        results.append(row_vals)
-    return results
 
 
 async def reset_dut(dut):
     """Reset the DUT."""
     dut.rst_n.value = 0
-    dut.en.value = 0
     dut.wr_en.value = 0
-    dut.wr_addr.value = 0
-    dut.wr_data.value = 0
-    dut.input_addr.value = 0
-    dut.input_first_in.value = 0
-    dut.input_last_in.value = 0
-    dut.weight_addr.value = 0
-    dut.weight_first_in.value = 0
-    dut.weight_last_in.value = 0
-    dut.precision_mode.value = 1  # INT16 mode
-    dut.compute_enable.value = 0
-    dut.drain_enable.value = 0
-    dut.acc_clear.value = 0
+    dut.ctrl_in.value = 0  # addresses and first/last markers (ubss_ctrl_tb)
+    dut.mode_in.value = IDLE  # en/compute/drain/acc_clear low, precision set
     await ClockCycles(dut.clk, 3)
     dut.rst_n.value = 1
     await RisingEdge(dut.clk)
@@ -69,8 +48,7 @@ async def reset_dut(dut):
 @cocotb.test()
 async def test_ubss_matmul(dut):
     """Test UB → Skewer → Systolic matmul with identity matrix."""
-    clock = Clock(dut.clk, 10, units="ns")
-    cocotb.start_soon(clock.start())
+    edge = RisingEdge(dut.clk)
 
     await reset_dut(dut)
 
@@ -100,73 +78,67 @@ async def test_ubss_matmul(dut):
     # ========================================================================
     # Phase 1: Clear accumulators
     # ========================================================================
-    dut.acc_clear.value = 1
-    await RisingEdge(dut.clk)
-    dut.acc_clear.value = 0
+    mode_in = dut.mode_in
+    mode_in.value = pack_mode(PRECISION_MODE, acc_clear=True)
+    await edge
+    mode_in.value = IDLE
 
     # ========================================================================
     # Phase 2: Feed data through UB → Skewer → Systolic
     # ========================================================================
-    dut.en.value = 1
-    dut.compute_enable.value = 1
-
-    input_skewed = []
-    weight_skewed = []
+    mode_in.value = pack_mode(PRECISION_MODE, en=True, compute=True)
 
-    # Feed N addresses
-    for col in range(N):
-        # Set markers
-        dut.input_first_in.value = 1 if col == 0 else 0
-        dut.input_last_in.value = 1 if col == N - 1 else 0
-        dut.weight_first_in.value = 1 if col == 0 else 0
-        dut.weight_last_in.value = 1 if col == N - 1 else 0
+    # Raw skewer output bytes per cycle (N feed + 3*N drain), slots allocated
+    # up front; lanes are only unpacked when the timeline is logged
+    input_skewed = [b""] * (4 * N)
+    weight_skewed = [b""] * (4 * N)
+    input_skewed_flat = dut.input_skewed_flat
+    weight_skewed_flat = dut.weight_skewed_flat
 
-        # Set addresses (input: 1-4, weight: 8-11)
-        dut.input_addr.value = col + 1
-        dut.weight_addr.value = 8 + col
+    # Feed N addresses (input: 1-4, weight: 8-11) with first/last markers on
+    # the ends; each cycle's controls are one packed ctrl_in write
+    ctrl_in = dut.ctrl_in
+    schedule = [pack_ctrl(col + 1, 8 + col, first=col == 0, last=col == N - 1) for col in range(N)]
+    for col, ctrl in enumerate(schedule):
+        ctrl_in.value = ctrl
 
-        await RisingEdge(dut.clk)
+        await edge
 
         # Capture skewed outputs
-        input_skewed.append(unpack_flat(dut.input_skewed_flat.value.integer))
-        weight_skewed.append(unpack_flat(dut.weight_skewed_flat.value.integer))
+        input_skewed[col] = input_skewed_flat.value.buff
+        weight_skewed[col] = weight_skewed_flat.value.buff
 
-    # Clear address inputs
-    dut.input_first_in.value = 0
-    dut.input_last_in.value = 0
-    dut.weight_first_in.value = 0
-    dut.weight_last_in.value = 0
-    dut.input_addr.value = 0
-    dut.weight_addr.value = 0
+    # Clear address inputs and markers
+    ctrl_in.value = 0
 
     # Continue feeding zeros and let computation complete
     # Need 3*N cycles for full diagonal wavefront (N input + 2N drain)
-    for _ in range(3 * N):
-        await RisingEdge(dut.clk)
-        input_skewed.append(unpack_flat(dut.input_skewed_flat.value.integer))
-        weight_skewed.append(unpack_flat(dut.weight_skewed_flat.value.integer))
+    for t in range(N, 4 * N):
+        await edge
+        input_skewed[t] = input_skewed_flat.value.buff
+        weight_skewed[t] = weight_skewed_flat.value.buff
 
     # Disable compute, wait for results
-    dut.compute_enable.value = 0
+    mode_in.value = pack_mode(PRECISION_MODE, en=True)
     await ClockCycles(dut.clk, 2)
 
     # ========================================================================
     # Print skewed data timeline
     # ========================================================================
-    dut._log.info("INPUT SKEWED DATA:")
-    for t, out in enumerate(input_skewed):
-        out_hex = [f"0x{v:04x}" for v in out]
-        dut._log.info(f"  Cycle {t:2d}: {out_hex}")
+    # Skip formatting the whole timeline when INFO is filtered out
+    if dut._log.isEnabledFor(logging.INFO):
+        dut._log.info("INPUT SKEWED DATA:")
+        for t, raw in enumerate(input_skewed):
+            dut._log.info("  Cycle %2d: %s", t, [f"0x{v:04x}" for v in unpack_flat(raw)])
 
-    dut._log.info("WEIGHT SKEWED DATA:")
-    for t, out in enumerate(weight_skewed):
-        out_hex = [f"0x{v:04x}" for v in out]
-        dut._log.info(f"  Cycle {t:2d}: {out_hex}")
+        dut._log.info("WEIGHT SKEWED DATA:")
+        for t, raw in enumerate(weight_skewed):
+            dut._log.info("  Cycle %2d: %s", t, [f"0x{v:04x}" for v in unpack_flat(raw)])
 
     # ========================================================================
     # Read results
     # ========================================================================
-    results = unpack_results(dut.results_flat.value.integer)
+    results = unpack_results(dut.results_flat.value.buff, N)
 
     dut._log.info("=" * 70)
     dut._log.info("SYSTOLIC ARRAY RESULTS:")
@@ -177,12 +149,12 @@ async def test_ubss_matmul(dut):
     # Expected result: A * I = A
     # Row 0: [1, 2, 3, 4], Row 1: [5, 6, 7, 8]
     # Row 2: [9, 10, 11, 12], Row 3: [13, 14, 15, 16]
-    expected = [
+    expected = np.array([
         [1, 2, 3, 4],
         [5, 6, 7, 8],
         [9, 10, 11, 12],
         [13, 14, 15, 16],
-    ]
+    ])
 
     dut._log.info("=" * 70)
     dut._log.info("EXPECTED RESULTS (A * I = A):")
@@ -191,15 +163,13 @@ async def test_ubss_matmul(dut):
         dut._log.info(f"  Row {row}: [{', '.join(row_str)}]")
 
     # Check results
-    passed = True
-    for row in range(N):
-        for col in range(N):
-            if results[row][col] != expected[row][col]:
-                dut._log.error(
-                    f"Mismatch at [{row}][{col}]: "
-                    f"got {results[row][col]}, expected {expected[row][col]}"
-                )
-                passed = False
+    mismatches = np.argwhere(results != expected)
+    for row, col in mismatches:
+        dut._log.error(
+            f"Mismatch at [{row}][{col}]: "
+            f"got {results[row][col]}, expected {expected[row][col]}"
+        )
+    passed = len(mismatches) == 0
 
     if passed:
         dut._log.info("✓ UBSS test PASSED: A * I = A verified!")
@@ -1,43 +1,47 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, ClockCycles, Timer
+from cocotb.triggers import First, RisingEdge, ClockCycles, Timer
 import numpy as np
+import struct
 
 # Constants
 N = 4
 DATA_WIDTH = 16
 ACC_WIDTH = 64
 
+# N little-endian uint16 lanes == one packed vector, lane 0 in the LSBs
+_LANES = struct.Struct(f"<{N}H")
+_LANES_MASK = (1 << (N * DATA_WIDTH)) - 1
+
 def pack_vector(vals):
-    res = 0
-    for i, v in enumerate(vals):
-        res |= (int(v) & 0xFFFF) << (i * 16)
-    return res
+    return int.from_bytes(_LANES.pack(*(int(v) & 0xFFFF for v in vals)), "little")
 
 def unpack_vector(val):
-    return [(val >> (i * 16)) & 0xFFFF for i in range(N)]
+    return list(_LANES.unpack((val & _LANES_MASK).to_bytes(_LANES.size, "little")))
 
 @cocotb.test()
 async def test_ubss_isolation(dut):
     """Isolated test for UBSS: Loading -> Compute -> Drain -> PPU Capture"""
+    edge = RisingEdge(dut.clk)
+
     clock = Clock(dut.clk, 10, units="ns")
     cocotb.start_soon(clock.start())
 
-    # 1. Reset
-    dut.rst_n.value = 0
-    dut.en.value = 1
-    dut.cu_req.value = 0
-    dut.cu_wr_en.value = 0
-    dut.compute_enable.value = 0
-    dut.drain_enable.value = 0
-    dut.acc_clear.value = 0
-    dut.precision_mode.value = 2 # MODE_INT16
-    dut.ppu_wb_en.value = 0
-    dut.ppu_capture_en.value = 0
-    dut.ppu_cycle_idx.value = 0
+    # 1. Reset (initial values applied immediately, no scheduled writes)
+    dut.rst_n.setimmediatevalue(0)
+    dut.en.setimmediatevalue(1)
+    dut.cu_req.setimmediatevalue(0)
+    dut.cu_wr_en.setimmediatevalue(0)
+    dut.compute_enable.setimmediatevalue(0)
+    dut.drain_enable.setimmediatevalue(0)
+    dut.acc_clear.setimmediatevalue(0)
+    dut.precision_mode.setimmediatevalue(2) # MODE_INT16
+    dut.ppu_wb_en.setimmediatevalue(0)
+    dut.ppu_capture_en.setimmediatevalue(0)
+    dut.ppu_cycle_idx.setimmediatevalue(0)
     await ClockCycles(dut.clk, 5)
     dut.rst_n.value = 1
-    await RisingEdge(dut.clk)
+    await edge
 
     # 2. Load Data into UB via cu interface
     # Matrix A (4x4): Identity * 2
@@ -59,7 +63,7 @@ async def test_ubss_isolation(dut):
         dut.cu_wr_en.value = 1
         dut.cu_addr.value = 0x00 + i
         dut.cu_wdata.value = word
-        await RisingEdge(dut.clk)
+        await edge
     
     dut._log.info("Loading Matrix B (Row-Major)...")
     for i in range(4):
@@ -69,16 +73,16 @@ async def test_ubss_isolation(dut):
         dut.cu_wr_en.value = 1
         dut.cu_addr.value = 0x10 + i
         dut.cu_wdata.value = word
-        await RisingEdge(dut.clk)
+        await edge
         
     dut.cu_req.value = 0
     dut.cu_wr_en.value = 0
-    await RisingEdge(dut.clk)
+    await edge
 
     # 3. Start Compute
     dut._log.info("Starting Computation...")
     dut.acc_clear.value = 1
-    await RisingEdge(dut.clk)
+    await edge
     dut.acc_clear.value = 0
     
     dut.compute_enable.value = 1
@@ -89,7 +93,7 @@ async def test_ubss_isolation(dut):
         dut.sa_weight_first.value = 1 if i == 0 else 0
         dut.sa_input_last.value = 1 if i == 3 else 0
         dut.sa_weight_last.value = 1 if i == 3 else 0
-        await RisingEdge(dut.clk)
+        await edge
     
     dut.compute_enable.value = 1 # Keep enabled to flush skewers
     dut.sa_input_first.value = 0
@@ -97,14 +101,11 @@ async def test_ubss_isolation(dut):
     dut.sa_input_last.value = 0
     dut.sa_weight_last.value = 0
     
-    # Wait for all_done
-    for _ in range(100):
-        await RisingEdge(dut.clk)
-        if int(dut.all_done.value) == 1:
-            dut._log.info("Computation Complete (all_done detected)")
-            break
-    else:
+    # Wait for all_done (one wake-up when the array drains, bounded at 100 cycles)
+    timeout = ClockCycles(dut.clk, 100)
+    if await First(RisingEdge(dut.all_done), timeout) is timeout:
         raise AssertionError("Timeout waiting for all_done")
+    dut._log.info("Computation Complete (all_done detected)")
 
     # 4. Drain into PPU
     dut._log.info("Draining Results into PPU...")
@@ -114,11 +115,11 @@ async def test_ubss_isolation(dut):
     
     for i in range(4):
         dut.ppu_cycle_idx.value = i
-        await RisingEdge(dut.clk)
+        await edge
     
     dut.drain_enable.value = 0
     dut.ppu_capture_en.value = 0
-    await RisingEdge(dut.clk)
+    await edge
 
     # 5. Verify PPU results by reading back via MMIO mux
     # We set ppu_wb_en = 1 to select PPU data on ub_final_wdata
@@ -1,6 +1,6 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge
+from cocotb.triggers import ClockCycles, RisingEdge
 
 
 DATA_WIDTH = 16
@@ -35,8 +35,7 @@ def _expected_word(bases: tuple[int, int, int, int]) -> int:
 async def _read_word(dut, addr: int) -> tuple[int, int]:
     dut.input_addr.value = addr
     dut.weight_addr.value = addr
-    await RisingEdge(dut.clk)
-    await RisingEdge(dut.clk)
+    await ClockCycles(dut.clk, 2)
     return dut.input_data.value.integer, dut.weight_data.value.integer
 
 
@@ -56,8 +55,7 @@ async def test_fpga_bram_int4_partial_writes_pack_to_bytes(dut):
     dut.weight_last_in.value = 0
     dut.input_addr.value = 0
     dut.weight_addr.value = 0
-    await RisingEdge(dut.clk)
-    await RisingEdge(dut.clk)
+    await ClockCycles(dut.clk, 2)
     dut.rst_n.value = 1
     await RisingEdge(dut.clk)
 
@@ -0,0 +1,106 @@
+`timescale 1ns/1ps
+`include "defines.sv"
+
+// ============================================================================
+// Tiled MatMul Test Wrapper (HDL clock)
+// ============================================================================
+// Generates the 100 MHz clock inside the simulator so test_tiled_matmul does
+// not have to toggle clk from Python for every one of its thousands of
+// edges; the test only waits on RisingEdge(dut.clk) and drives the ports.
+// Re-exports the CU and streamer ports of ubss the test uses, ties off the
+// PPU and host shared-SRAM ports, and flattens the array accumulators into
+// results_flat (Row0_Col0 in the LSBs, row-major).
+
+module tiled_matmul_tb #(
+    parameter INIT_FILE = ""
+) (
+    output logic clk,
+    input  logic rst_n,
+    input  logic en,
+
+    input  logic                     cu_req,
+    input  logic                     cu_wr_en,
+    input  logic [`ADDR_WIDTH-1:0]   cu_addr,
+    input  logic [`BUFFER_WIDTH-1:0] cu_wdata,
+    output logic [`BUFFER_WIDTH-1:0] cu_rdata,
+
+    input  logic [`ADDR_WIDTH-1:0]   sa_input_addr,
+    input  logic                     sa_input_first,
+    input  logic                     sa_input_last,
+    input  logic [`ADDR_WIDTH-1:0]   sa_weight_addr,
+    input  logic                     sa_weight_first,
+    input  logic                     sa_weight_last,
+
+    input  precision_mode_t          precision_mode,
+    input  logic                     compute_enable,
+    input  logic                     drain_enable,
+    input  logic                     acc_clear,
+
+    output logic [`ARRAY_SIZE*`ARRAY_SIZE*`ACC_WIDTH-1:0] results_flat,
+    output logic result_valid,
+    output logic all_done
+);
+
+    initial clk = 1'b0;
+    always #5 clk = ~clk;
+
+    genvar r, c;
+    generate
+        for (r = 0; r < `ARRAY_SIZE; r++) begin : flatten_rows
+            for (c = 0; c < `ARRAY_SIZE; c++) begin : flatten_cols
+                assign results_flat[(r*`ARRAY_SIZE+c+1)*`ACC_WIDTH-1 -: `ACC_WIDTH] = dut.sa_results[r][c];
+            end
+        end
+    endgenerate
+
+    ubss #(
+        .UB_INIT_FILE(INIT_FILE)
+    ) dut (
+        .clk                     (clk),
+        .rst_n                   (rst_n),
+        .en                      (en),
+        .cu_req                  (cu_req),
+        .cu_wr_en                (cu_wr_en),
+        .cu_addr                 (cu_addr),
+        .cu_wdata                (cu_wdata),
+        .cu_rdata                (cu_rdata),
+        .host_shared_addr        ('0),
+        .host_shared_lane        ('0),
+        .host_shared_wr_data     ('0),
+        .host_shared_wr_be       ('0),
+        .host_shared_wr_en       (1'b0),
+        .host_shared_rd_en       (1'b0),
+        .host_shared_allow       (1'b0),
+        .host_shared_rd_data     (),
+        .sa_input_addr           (sa_input_addr),
+        .sa_input_first          (sa_input_first),
+        .sa_input_last           (sa_input_last),
+        .sa_weight_addr          (sa_weight_addr),
+        .sa_weight_first         (sa_weight_first),
+        .sa_weight_last          (sa_weight_last),
+        .precision_mode          (precision_mode),
+        .compute_enable          (compute_enable),
+        .drain_enable            (drain_enable),
+        .acc_clear               (acc_clear),
+        .ppu_wb_en               (1'b0),
+        .ppu_bias_en             (1'b0),
+        .ppu_bias_clear          (1'b0),
+        .ppu_cycle_idx           ('0),
+        .ppu_capture_en          (1'b0),
+        .ppu_shift               ('0),
+        .ppu_multiplier          ('0),
+        .ppu_activation          ('0),
+        .ppu_h_gelu_x_scale_shift('0),
+        .ppu_in_precision        ('0),
+        .ppu_out_precision       ('0),
+        .ppu_write_offset        ('0),
+        .ppu_output_layout       (output_layout_t'(0)),
+        .ppu_writeback_mode      (writeback_mode_t'(0)),
+        .ppu_cache_lane_idx      ('0),
+        .ppu_busy                (),
+        .ppu_done                (),
+        .result_valid            (result_valid),
+        .all_done                (all_done)
+    );
+
+endmodule
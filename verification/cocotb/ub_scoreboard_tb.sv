@@ -0,0 +1,115 @@
+`timescale 1ns/1ps
+`include "defines.sv"
+
+// ============================================================================
+// Unified Buffer Test Wrapper (in-simulator scoreboard)
+// ============================================================================
+// Re-exports the unified_buffer ports test_unified_buffer drives (full-word
+// writes: wr_mask is tied to all ones) and adds a scoreboard for the input
+// read port: every write is mirrored, and while check_en is high each
+// input_data word is compared against the mirror entry of the address that
+// produced it (one-cycle read latency). A differing word for an address
+// written since reset sets mismatch_sticky until the next reset, so a whole
+// read-back sweep is checked with a single read at the end instead of one
+// readback per address. The 100 MHz clock is generated here, so the tests
+// only wait on RisingEdge(dut.clk) instead of running a Python Clock.
+
+module ub_scoreboard_tb (
+    output logic clk,
+    input  logic rst_n,
+
+    input  logic                     wr_en,
+    input  logic [  `ADDR_WIDTH-1:0] wr_addr,
+    input  logic [`BUFFER_WIDTH-1:0] wr_data,
+
+    input  logic                     input_first_in,
+    input  logic                     input_last_in,
+    input  logic [  `ADDR_WIDTH-1:0] input_addr,
+    output logic                     input_first_out,
+    output logic                     input_last_out,
+    output logic [`BUFFER_WIDTH-1:0] input_data,
+
+    input  logic                     weight_first_in,
+    input  logic                     weight_last_in,
+    input  logic [  `ADDR_WIDTH-1:0] weight_addr,
+    output logic                     weight_first_out,
+    output logic                     weight_last_out,
+    output logic [`BUFFER_WIDTH-1:0] weight_data,
+
+    input  logic                     check_en,
+    output logic                     mismatch_sticky
+);
+
+    initial clk = 1'b0;
+    always #5 clk = ~clk;
+
+    unified_buffer dut (
+        .clk             (clk),
+        .rst_n           (rst_n),
+        .wr_en           (wr_en),
+        .wr_mask         ({`BUFFER_WIDTH{1'b1}}),
+        .wr_addr         (wr_addr),
+        .wr_data         (wr_data),
+        .input_first_in  (input_first_in),
+        .input_last_in   (input_last_in),
+        .input_addr      (input_addr),
+        .input_first_out (input_first_out),
+        .input_last_out  (input_last_out),
+        .input_data      (input_data),
+        .weight_first_in (weight_first_in),
+        .weight_last_in  (weight_last_in),
+        .weight_addr     (weight_addr),
+        .weight_first_out(weight_first_out),
+        .weight_last_out (weight_last_out),
+        .weight_data     (weight_data)
+    );
+
+    // ------------------------------------------------------------------------
+    // Scoreboard
+    // ------------------------------------------------------------------------
+    /* verilator tracing_off */
+    logic [`BUFFER_WIDTH-1:0] mirror       [`BUFFER_DEPTH-1:0];
+    logic                     mirror_valid [`BUFFER_DEPTH-1:0];
+    /* verilator tracing_on */
+
+    logic [`ADDR_WIDTH-1:0]   check_addr_q;
+    logic [`BUFFER_WIDTH-1:0] expected_q;
+    logic                     check_q;
+
+    always_ff @(posedge clk) begin
+        if (wr_en) begin
+            mirror[wr_addr] <= wr_data;
+        end
+    end
+
+    always_ff @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            for (int i = 0; i < `BUFFER_DEPTH; i++) mirror_valid[i] <= 1'b0;
+        end else if (wr_en) begin
+            mirror_valid[wr_addr] <= 1'b1;
+        end
+    end
+
+    // Capture the expected word alongside the UB's own registered read
+    always_ff @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            check_addr_q <= '0;
+            expected_q   <= '0;
+            check_q      <= 1'b0;
+        end else begin
+            check_addr_q <= input_addr;
+            expected_q   <= mirror[input_addr];
+            check_q      <= check_en && mirror_valid[input_addr];
+        end
+    end
+
+    always_ff @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            mismatch_sticky <= 1'b0;
+        end else if (check_q && input_data != expected_q) begin
+            mismatch_sticky <= 1'b1;
+            $display("[UB SCOREBOARD] addr %0d: got %h, expected %h", check_addr_q, input_data, expected_q);
+        end
+    end
+
+endmodule
@@ -0,0 +1,44 @@
+"""Packed control words for ubss_ctrl_tb.sv.
+
+ctrl_in carries the per-cycle streamer controls (one write per cycle); mode_in
+carries the datapath controls that are held across many cycles, so a reset or
+phase change is a single write as well.
+"""
+
+ADDR_WIDTH = 16
+
+INPUT_FIRST = 1 << (2 * ADDR_WIDTH)
+INPUT_LAST = 1 << (2 * ADDR_WIDTH + 1)
+WEIGHT_FIRST = 1 << (2 * ADDR_WIDTH + 2)
+WEIGHT_LAST = 1 << (2 * ADDR_WIDTH + 3)
+
+
+def pack_ctrl(input_addr, weight_addr, first=False, last=False):
+    """Build ctrl_in: both addresses plus shared input/weight first/last markers."""
+    ctrl = input_addr | (weight_addr << ADDR_WIDTH)
+    if first:
+        ctrl |= INPUT_FIRST | WEIGHT_FIRST
+    if last:
+        ctrl |= INPUT_LAST | WEIGHT_LAST
+    return ctrl
+
+
+MODE_EN = 1 << 0
+MODE_COMPUTE = 1 << 1
+MODE_DRAIN = 1 << 2
+MODE_ACC_CLEAR = 1 << 3
+MODE_PRECISION_SHIFT = 4
+
+
+def pack_mode(precision_mode, en=False, compute=False, drain=False, acc_clear=False):
+    """Build mode_in: UB enable, compute/drain enables, acc_clear and precision mode."""
+    mode = precision_mode << MODE_PRECISION_SHIFT
+    if en:
+        mode |= MODE_EN
+    if compute:
+        mode |= MODE_COMPUTE
+    if drain:
+        mode |= MODE_DRAIN
+    if acc_clear:
+        mode |= MODE_ACC_CLEAR
+    return mode
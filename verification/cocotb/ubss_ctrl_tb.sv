@@ -0,0 +1,125 @@
+`timescale 1ns/1ps
+`include "defines.sv"
+
+// ============================================================================
+// UBSS Test Wrapper (packed streamer control)
+// ============================================================================
+// Exposes ubss to test_ubss / test_ubss_k12 with the per-cycle streamer
+// controls packed into one ctrl_in word, so the feed loops drive a single
+// signal per clock instead of six. Layout (see ubss_ctrl.py):
+//   [ADDR_WIDTH-1:0]              input_addr
+//   [2*ADDR_WIDTH-1:ADDR_WIDTH]   weight_addr
+//   [2*ADDR_WIDTH]                input_first
+//   [2*ADDR_WIDTH+1]              input_last
+//   [2*ADDR_WIDTH+2]              weight_first
+//   [2*ADDR_WIDTH+3]              weight_last
+// The held datapath controls are packed into mode_in the same way, so reset
+// and phase changes are one write too:
+//   [0]    en
+//   [1]    compute_enable
+//   [2]    drain_enable
+//   [3]    acc_clear
+//   [5:4]  precision_mode
+// wr_* writes go through the CU port. Also flattens the skewer outputs into
+// input/weight_skewed_flat (row 0 in the LSBs) and the array accumulators into
+// results_flat (Row0_Col0 in the LSBs, row-major). PPU and host shared-SRAM
+// ports are tied off. The 100 MHz clock is generated here, so the tests only
+// wait on RisingEdge(dut.clk) instead of running a Python Clock.
+
+module ubss_ctrl_tb #(
+    parameter INIT_FILE = ""
+) (
+    output logic clk,
+    input  logic rst_n,
+
+    input  logic                     wr_en,
+    input  logic [`ADDR_WIDTH-1:0]   wr_addr,
+    input  logic [`BUFFER_WIDTH-1:0] wr_data,
+
+    input  logic [2*`ADDR_WIDTH+3:0] ctrl_in,
+
+    input  logic [5:0]               mode_in,
+
+    output logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]            input_skewed_flat,
+    output logic [`ARRAY_SIZE*`DATA_WIDTH-1:0]            weight_skewed_flat,
+    output logic [`ARRAY_SIZE*`ARRAY_SIZE*`ACC_WIDTH-1:0] results_flat,
+    output logic result_valid,
+    output logic all_done
+);
+
+    initial clk = 1'b0;
+    always #5 clk = ~clk;
+
+    logic [`ADDR_WIDTH-1:0] input_addr, weight_addr;
+    logic input_first, input_last, weight_first, weight_last;
+
+    assign {weight_last, weight_first, input_last, input_first, weight_addr, input_addr} = ctrl_in;
+
+    logic en, compute_enable, drain_enable, acc_clear;
+    precision_mode_t precision_mode;
+
+    assign {acc_clear, drain_enable, compute_enable, en} = mode_in[3:0];
+    assign precision_mode = precision_mode_t'(mode_in[5:4]);
+
+    genvar r, c;
+    generate
+        for (r = 0; r < `ARRAY_SIZE; r++) begin : flatten_rows
+            assign input_skewed_flat[r*`DATA_WIDTH +: `DATA_WIDTH]  = dut.skewed_input[r];
+            assign weight_skewed_flat[r*`DATA_WIDTH +: `DATA_WIDTH] = dut.skewed_weight[r];
+            for (c = 0; c < `ARRAY_SIZE; c++) begin : flatten_cols
+                assign results_flat[(r*`ARRAY_SIZE+c+1)*`ACC_WIDTH-1 -: `ACC_WIDTH] = dut.sa_results[r][c];
+            end
+        end
+    endgenerate
+
+    ubss #(
+        .UB_INIT_FILE(INIT_FILE)
+    ) dut (
+        .clk                     (clk),
+        .rst_n                   (rst_n),
+        .en                      (en),
+        .cu_req                  (wr_en),
+        .cu_wr_en                (wr_en),
+        .cu_addr                 (wr_addr),
+        .cu_wdata                (wr_data),
+        .cu_rdata                (),
+        .host_shared_addr        ('0),
+        .host_shared_lane        ('0),
+        .host_shared_wr_data     ('0),
+        .host_shared_wr_be       ('0),
+        .host_shared_wr_en       (1'b0),
+        .host_shared_rd_en       (1'b0),
+        .host_shared_allow       (1'b0),
+        .host_shared_rd_data     (),
+        .sa_input_addr           (input_addr),
+        .sa_input_first          (input_first),
+        .sa_input_last           (input_last),
+        .sa_weight_addr          (weight_addr),
+        .sa_weight_first         (weight_first),
+        .sa_weight_last          (weight_last),
+        .precision_mode          (precision_mode),
+        .compute_enable          (compute_enable),
+        .drain_enable            (drain_enable),
+        .acc_clear               (acc_clear),
+        .ppu_wb_en               (1'b0),
+        .ppu_bias_en             (1'b0),
+        .ppu_bias_clear          (1'b0),
+        .ppu_cycle_idx           ('0),
+        .ppu_capture_en          (1'b0),
+        .ppu_shift               ('0),
+        .ppu_multiplier          ('0),
+        .ppu_activation          ('0),
+        .ppu_h_gelu_x_scale_shift('0),
+        .ppu_in_precision        ('0),
+        .ppu_out_precision       ('0),
+        .ppu_write_offset        ('0),
+        .ppu_output_layout       (output_layout_t'(0)),
+        .ppu_writeback_mode      (writeback_mode_t'(0)),
+        .ppu_cache_lane_idx      ('0),
+        .ppu_busy                (),
+        .ppu_done                (),
+        .result_valid            (result_valid),
+        .all_done                (all_done)
+    );
+
+endmodule